@@ -179,6 +179,20 @@ def create_app(config_name=None):
     app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(days=1)
     app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=2)
 
+    # Keep a pool of open connections to database servers. SQLite has its own pools,
+    # which do not accept these options.
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        app.config.setdefault(
+            "SQLALCHEMY_ENGINE_OPTIONS",
+            {
+                "pool_size": 10,
+                "max_overflow": 20,
+                "pool_timeout": 30,
+                "pool_pre_ping": True,
+                "pool_recycle": 1800,
+            },
+        )
+
     conn_app.add_api("swagger.yml")
     db.init_app(app)
     with app.app_context():
@@ -8,7 +8,7 @@ def run():
     # app.run(debug=True, use_reloader=True)
 
     # serve using waitress
-    serve(app, port=options["port"])
+    serve(app, port=options["port"], threads=options["threads"])
 
 
 if __name__ == "__main__":
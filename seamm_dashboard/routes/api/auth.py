@@ -2,7 +2,7 @@
 Routes for REST authentication
 """
 
-from datetime import timedelta, datetime, timezone
+import time
 
 from flask import jsonify, make_response, request, redirect, url_for
 from flask.wrappers import Response
@@ -25,20 +25,24 @@ __all__ = ["get_auth_token", "remove_auth_token", "refresh_expiring_jwts"]
 
 
 def refresh_expiring_jwts(response):
-    """This will automatically refresh tokens that are within 30 minutes of expiring"""
+    """This will automatically refresh tokens that have expired
+
+    The claims are the ones already decoded by jwt_required for this request, so the
+    token is not decoded again, and requests without a token return immediately.
+    """
 
     try:
-        exp_timestamp = get_jwt()["exp"]
-        now = datetime.now(timezone.utc)
-        target_timestamp = datetime.timestamp(now + timedelta(seconds=0))
-        if target_timestamp > exp_timestamp:
-            access_token = create_access_token(identity=get_jwt_identity())
-            set_access_cookies(response, access_token)
-        return response
-    except (RuntimeError, KeyError):
-        # Case where there is not a valid JWT. Just return the original respone
+        exp_timestamp = get_jwt().get("exp")
+    except RuntimeError:
+        # Case where the JWT was not checked. Just return the original response
         return response
 
+    if exp_timestamp is not None and time.time() > exp_timestamp:
+        access_token = create_access_token(identity=get_jwt_identity())
+        set_access_cookies(response, access_token)
+
+    return response
+
 
 def create_tokens(user):
     """
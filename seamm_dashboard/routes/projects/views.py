@@ -1,10 +1,11 @@
-from copy import deepcopy
+from functools import lru_cache
 import os
 
-from flask import render_template, url_for, request, flash, redirect
+from flask import render_template, url_for, request, flash, redirect, make_response
 from flask_jwt_extended import jwt_required, get_current_user
 
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 from pathlib import Path
 
@@ -18,54 +19,104 @@ from seamm_datastore.database.models import (
     User,
     UserProjectAssociation,
     Job,
+    job_project,
 )  # noqa: E501
 
 from seamm_dashboard import authorize, db, datastore
 
 from seamm_dashboard.routes.api.auth import refresh_expiring_jwts
 
+# The permissions that can be given to users for a project
+_ACTIONS = ("read", "update", "create", "delete", "manage")
 
-def _bind_users_to_form(form, current_user, project_id):
-    """Function to bind current usernames to form
 
-    This has to be done dynamically based on what is in the database. That's why it is
-    in this file and occurs when the page is viewed rather than in the form object.
+def _conditional_response(rendered):
+    """Make a response with an ETag so that unchanged pages return 304."""
+
+    response = make_response(rendered)
+    response.add_etag()
+
+    return response.make_conditional(request)
+
+
+def _get_project(project_id):
+    """Get a project along with what is needed to check its permissions.
+
+    The owner and group are loaded in the same query so that authorize does not
+    have to lazily load them. The special user and group permissions are dynamic
+    relationships, which cannot be eagerly loaded.
+    """
+
+    return Project.query.options(
+        joinedload(Project.owner), joinedload(Project.group)
+    ).get(project_id)
+
+
+@lru_cache(maxsize=128)
+def _access_form_class(public, user_fields):
+    """Create the class of the form for managing access to a project.
+
+    The fields are added when the class is created, so the base class is never
+    modified. Forms with the same fields and defaults share one class.
+
+    Parameters
+    ----------
+    public : bool
+        Whether the project is currently publicly readable.
+    user_fields : tuple
+        The (field name, checked) pairs for the user permissions.
+    """
+
+    fields = {name: BooleanField(default=checked) for name, checked in user_fields}
+    fields["allow_public"] = BooleanField(
+        "Make project publicly readable", default=public
+    )
+
+    return type("ProjectAccessForm", (ManageProjectAccessForm,), fields)
+
+
+def _create_access_form(current_user, project, users):
+    """Function to create the form for managing access to a project
+
+    The fields depend on the users in the database. That's why it is in this file
+    and occurs when the page is viewed rather than in the form object. The users
+    need only have an id and username.
     """
 
-    actions = ["read", "update", "create", "delete", "manage"]
-    users = User.query.all()
+    users = list(users)
     user_names = []
 
-    if len(users) > 1:
-        # Put current user first
-        users.remove(current_user)
-        reorder_users = [current_user]
-        reorder_users.extend(users)
-        users = reorder_users
+    # Put current user first, keeping the order of the others
+    users.sort(key=lambda user: user.id != current_user.id)
 
+    # Get all of the special permissions for this project in one query
+    user_permissions = {
+        x.entity_id: x.permissions
+        for x in UserProjectAssociation.query.filter_by(resource_id=project.id).all()
+    }
+
+    user_fields = []
     for user in users:
         field_name = f"user_{user.id}"
-        permissions = []
-        assoc = UserProjectAssociation.query.filter_by(
-            resource_id=project_id, entity_id=user.id
-        ).one_or_none()
-
-        if assoc:
-            permissions = assoc.permissions
+        permissions = frozenset(user_permissions.get(user.id) or [])
 
-        for action in actions:
+        for action in _ACTIONS:
             checked = action in permissions
-            setattr(form, f"{field_name}_{action}", BooleanField(default=checked))
+            user_fields.append((f"{field_name}_{action}", checked))
 
         user_names.append({"username": user.username, "id": user.id})
 
-    return form, user_names
+    # Add public permissions information to form. Use the column directly rather
+    # than building the dictionary of all the permissions.
+    public = "read" in (project.other_permissions or [])
+
+    return _access_form_class(public, tuple(user_fields)), user_names
 
 
 @projects.route("/views/projects")
 @jwt_required(optional=True)
 def project_list():
-    return render_template("projects/project_list.html")
+    return _conditional_response(render_template("projects/project_list.html"))
 
 
 @projects.route("/views/projects/<id>/jobs")
@@ -73,23 +124,23 @@ def project_list():
 @jwt_required(optional=True)
 def project_jobs_list(id):
 
-    project = Project.query.get(id)
+    project = _get_project(id)
 
     manage_project = authorize.manage(project)
     edit_project = authorize.update(project)
 
-    # Build the url ourselves.
-    base_url = url_for("main.index")
-    edit_url = base_url + f"projects/{id}/edit"
-    manage_url = base_url + f"projects/{id}/manage"
-
-    return render_template(
-        "jobs/jobs_list.html",
-        project=True,
-        manage_project=manage_project,
-        edit_project=edit_project,
-        edit_url=edit_url,
-        manage_url=manage_url,
+    edit_url = url_for("projects.edit_project", project_id=id)
+    manage_url = url_for("projects.manage_project", project_id=id)
+
+    return _conditional_response(
+        render_template(
+            "jobs/jobs_list.html",
+            project=True,
+            manage_project=manage_project,
+            edit_project=edit_project,
+            edit_url=edit_url,
+            manage_url=manage_url,
+        )
     )
 
 
@@ -97,16 +148,15 @@ def project_jobs_list(id):
 @jwt_required(optional=True)
 def edit_project(project_id):
 
-    project = Project.query.get(project_id)
+    project = _get_project(project_id)
 
     if not authorize.update(project):
         return render_template("401.html")
 
     form = EditProject()
 
-    # Build the url ourselves.
-    base_url = url_for("main.index")
-    project_url = base_url + f"#projects/{project_id}/jobs"
+    # The project page is routed in the browser
+    project_url = url_for("main.index", _anchor=f"projects/{project_id}/jobs")
 
     if form.validate_on_submit():
         # Rename project path
@@ -119,12 +169,11 @@ def edit_project(project_id):
             flash(f"A project with the name {form.name.data} already exists.")
             return redirect(url_for("projects.edit_project", project_id=project_id))
 
-        # Need to change this to query, but this will work
-        # without modifying the DB for now.
-        job_ids = [x.id for x in project.jobs]
-
-        # Update job paths
-        Job.query.filter(Job.id.in_(job_ids)).update(
+        # Update job paths without loading the jobs
+        project_jobs = db.session.query(job_project.c.job).filter(
+            job_project.c.project == project.id
+        )
+        Job.query.filter(Job.id.in_(project_jobs)).update(
             {Job.path: func.replace(Job.path, path, new_path)},
             synchronize_session=False,
         )
@@ -157,7 +206,7 @@ def edit_project(project_id):
 @jwt_required(optional=True)
 def manage_project(project_id):
 
-    project = Project.query.get(project_id)
+    project = _get_project(project_id)
 
     if not project:
         return render_template("404.html")
@@ -165,50 +214,37 @@ def manage_project(project_id):
     if not authorize.manage(project):
         return render_template("401.html")
 
-    form = deepcopy(ManageProjectAccessForm)
-
     # Add users to form
-    form, usernames = _bind_users_to_form(
-        form, current_user=get_current_user(), project_id=project.id
-    )
-
-    # Add public permissions information to form
-    public = "read" in project.permissions["other"]
-    form.allow_public = BooleanField("Make project publicly readable", default=public)
+    users = db.session.query(User.id, User.username).all()
+    form, usernames = _create_access_form(get_current_user(), project, users)
 
     form = form()
 
-    # Build the url ourselves.
-    base_url = url_for("main.index")
-    project_url = base_url + f"#projects/{project_id}/jobs"
+    # The project page is routed in the browser
+    project_url = url_for("main.index", _anchor=f"projects/{project_id}/jobs")
 
     if request.method == "POST":
         if form.validate_on_submit():
 
-            if form.allow_public:
-                permissions = deepcopy(project.permissions)
-                permissions["other"] = ["read"]
-                project.permissions = permissions
-                db.session.commit()
-
-            user_keys = [
-                x for x in form.data.keys() if "user" in x if form.data[x] is True
-            ]
+            if form.allow_public.data:
+                project.other_permissions = ["read"]
+            else:
+                project.other_permissions = []
 
             permissions_dict = {}
 
-            for key in user_keys:
-                split = key.split("_")
-                user_id = int(split[1])
-                permission = split[2]
-
-                try:
-                    permissions_dict[user_id].append(permission)
-                except KeyError:
-                    permissions_dict[user_id] = [permission]
+            for field in form:
+                if field.name.startswith("user_") and field.data is True:
+                    _, user_id, permission = field.name.split("_", 2)
+                    permissions_dict.setdefault(int(user_id), []).append(permission)
 
             # Find an entries for special user permissions which exist for this project
-            users = User.query.all()
+            existing = {
+                x.entity_id: x
+                for x in UserProjectAssociation.query.filter_by(
+                    resource_id=project_id
+                ).all()
+            }
 
             for entry in users:
                 user_id = entry.id
@@ -218,21 +254,19 @@ def manage_project(project_id):
                 except KeyError:
                     permissions = []
 
-                assoc = UserProjectAssociation.query.filter_by(
-                    entity_id=user_id, resource_id=project_id
-                ).one_or_none()
-
-                if not assoc:
-                    assoc = UserProjectAssociation(
-                        entity_id=user_id,
-                        resource_id=project_id,
-                        permissions=permissions,
-                    )
+                if user_id in existing:
+                    existing[user_id].permissions = permissions
                 else:
-                    assoc.permissions = permissions
+                    db.session.add(
+                        UserProjectAssociation(
+                            entity_id=user_id,
+                            resource_id=project_id,
+                            permissions=permissions,
+                        )
+                    )
 
-                db.session.add(assoc)
-                db.session.commit()
+            # Write all of the changes in a single transaction
+            db.session.commit()
 
             flash(f"Permissions for {project.name} successfully updated.")
             return redirect(project_url)
@@ -255,9 +289,8 @@ def add_project():
 
     form = AddProject()
 
-    # Build the url ourselves.
-    base_url = url_for("main.index")
-    project_url = base_url + "#projects"
+    # The project page is routed in the browser
+    project_url = url_for("main.index", _anchor="projects")
 
     if form.validate_on_submit():
         # Create a directory for the project
@@ -25,6 +25,15 @@ parser.add_argument(
     help="the port to use",
 )
 
+parser.add_argument(
+    "SEAMM",
+    "--threads",
+    group="dashboard options",
+    default=8,
+    type=int,
+    help="the number of threads handling requests",
+)
+
 parser.add_argument(
     "SEAMM",
     "--initialize",
@@ -255,6 +255,37 @@ def admin_client(app):
     client.get("api/auth/token/remove", follow_redirects=True)
 
 
+@pytest.fixture(scope="module")
+def login(app):
+    """
+    Factory for clients logged in as a given user, each with its own cookies.
+    """
+    clients = []
+
+    def _login(username, password):
+        client = app.test_client()
+        response = client.post(
+            "api/auth/token",
+            json=dict(
+                username=username,
+                password=password,
+            ),
+            follow_redirects=True,
+        )
+
+        csrf_token = _get_cookie_from_response(response, "csrf_access_token")[
+            "csrf_access_token"
+        ]
+
+        clients.append(client)
+        return client, csrf_token
+
+    yield _login
+
+    for client in clients:
+        client.get("api/auth/token/remove", follow_redirects=True)
+
+
 @pytest.fixture
 def chrome_driver():
     chrome_options = webdriver.ChromeOptions()
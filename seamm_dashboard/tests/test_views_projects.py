@@ -0,0 +1,178 @@
+"""
+Tests for the project views (no browser needed)
+"""
+
+import re
+
+import pytest
+
+from seamm_dashboard import db
+
+from seamm_datastore.database.models import Project, UserProjectAssociation
+
+NOT_AUTHORIZED = "You do not have permissions to access this content."
+
+
+def test_manage_permissions_change_between_requests(login):
+    """Permissions granted after a refused request are used by the next request"""
+    client, _ = login("visitor", "visitor")
+
+    response = client.get("projects/100/manage")
+    assert NOT_AUTHORIZED in response.get_data(as_text=True)
+
+    assoc = UserProjectAssociation.query.filter_by(entity_id=10, resource_id=100).one()
+    assoc.permissions = ["read", "manage"]
+    db.session.commit()
+
+    try:
+        response = client.get("projects/100/manage")
+        page = response.get_data(as_text=True)
+        assert NOT_AUTHORIZED not in page
+        assert "Set Special User Permissions" in page
+    finally:
+        assoc.permissions = ["read"]
+        db.session.commit()
+
+    response = client.get("projects/100/manage")
+    assert NOT_AUTHORIZED in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize("allow_public, expected", [(True, ["read"]), (False, [])])
+def test_manage_project_public(login, app, monkeypatch, allow_public, expected):
+    """Only a checked box makes the project publicly readable"""
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    client, csrf_token = login("sample_user", "sample_password")
+
+    data = {"user_10_read": "y"}
+    if allow_public:
+        data["allow_public"] = "y"
+
+    response = client.post(
+        "projects/100/manage", data=data, headers={"X-CSRF-TOKEN": csrf_token}
+    )
+    assert response.status_code == 302
+
+    project = Project.query.get(100)
+    assert project.other_permissions == expected
+
+
+@pytest.mark.parametrize("url", ["views/projects", "views/projects/100/jobs"])
+def test_project_pages_not_modified(login, url):
+    """Replaying the ETag of an unchanged page gives 304"""
+    client, _ = login("sample_user", "sample_password")
+
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+def test_project_jobs_etag_depends_on_permissions(login):
+    """The jobs list for a manager and for a reader have different ETags"""
+    manager, _ = login("sample_user", "sample_password")
+    reader, _ = login("visitor", "visitor")
+
+    manager_etag = manager.get("views/projects/100/jobs").headers["ETag"]
+    reader_response = reader.get(
+        "views/projects/100/jobs", headers={"If-None-Match": manager_etag}
+    )
+
+    assert reader_response.status_code == 200
+    assert reader_response.headers["ETag"] != manager_etag
+
+
+def _checked(page, field):
+    """Whether the checkbox for a field is checked in a rendered page"""
+    match = re.search(rf'<input[^>]*id="{field}"[^>]*>', page)
+    assert match is not None, f"No field {field}"
+    return " checked" in match.group(0)
+
+
+def test_manage_project_form(login):
+    """The access form is built per request without changing the base form"""
+    # Imported here so that the views are not loaded before the app is created
+    from seamm_dashboard.routes.projects.forms import ManageProjectAccessForm
+
+    owner, _ = login("sample_user", "sample_password")
+    visitor, _ = login("visitor", "visitor")
+
+    project = Project.query.get(100)
+    assoc = UserProjectAssociation.query.filter_by(entity_id=10, resource_id=100).one()
+    assoc.permissions = ["read"]
+    project.other_permissions = []
+    db.session.commit()
+
+    page = owner.get("projects/100/manage").get_data(as_text=True)
+    assert _checked(page, "user_10_read")
+    assert not _checked(page, "user_10_manage")
+    assert not _checked(page, "user_3_read")
+    assert not _checked(page, "allow_public")
+
+    assoc.permissions = ["read", "manage"]
+    project.other_permissions = ["read"]
+    db.session.commit()
+
+    try:
+        page = visitor.get("projects/100/manage").get_data(as_text=True)
+        assert _checked(page, "user_10_read")
+        assert _checked(page, "user_10_manage")
+        assert not _checked(page, "user_10_delete")
+        assert _checked(page, "allow_public")
+    finally:
+        assoc.permissions = ["read"]
+        project.other_permissions = []
+        db.session.commit()
+
+    assert not hasattr(ManageProjectAccessForm, "allow_public")
+    assert not [x for x in dir(ManageProjectAccessForm) if x.startswith("user_")]
+
+
+def test_manage_project_save(login, app, monkeypatch):
+    """Saving the access form updates and creates the user permissions"""
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    client, csrf_token = login("sample_user", "sample_password")
+
+    # Start with only the visitor's permissions
+    UserProjectAssociation.query.filter(
+        UserProjectAssociation.resource_id == 100,
+        UserProjectAssociation.entity_id != 10,
+    ).delete()
+    db.session.commit()
+
+    data = {
+        "user_10_read": "y",
+        "user_10_update": "y",
+        "user_4_read": "y",
+        "user_4_manage": "y",
+        "user_3_delete": "y",
+    }
+    try:
+        response = client.post(
+            "projects/100/manage", data=data, headers={"X-CSRF-TOKEN": csrf_token}
+        )
+        assert response.status_code == 302
+        assert response.headers["Location"].endswith("/#projects/100/jobs")
+
+        permissions = {
+            x.entity_id: list(x.permissions or [])
+            for x in UserProjectAssociation.query.filter_by(resource_id=100)
+        }
+        assert permissions == {
+            1: [],
+            2: [],
+            3: ["delete"],
+            4: ["read", "manage"],
+            10: ["read", "update"],
+        }
+    finally:
+        UserProjectAssociation.query.filter(
+            UserProjectAssociation.resource_id == 100,
+            UserProjectAssociation.entity_id != 10,
+        ).delete()
+        UserProjectAssociation.query.filter_by(
+            entity_id=10, resource_id=100
+        ).one().permissions = ["read"]
+        db.session.commit()